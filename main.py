@@ -4,19 +4,30 @@
 
 # FastAPI for web API creation
 from fastapi import FastAPI  # The main web framework
-from fastapi.responses import FileResponse  # Used to send file as API response
+from fastapi.responses import Response  # Used to send SVG bytes as API response
 from fastapi.responses import HTMLResponse
+from fastapi.responses import ORJSONResponse  # orjson-backed JSON serialization
 from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware  # Compress responses on the wire
 
 # Pydantic for validating request data
 from models import DiagramInput, DiagramOutput  #  Import from models.py
 
-# Matplotlib for drawing the neural network
-import matplotlib.pyplot as plt
+# NumPy for vectorized edge coordinate computation
+import numpy as np
 
-# Utilities for unique file names and file path handling
-import uuid  # To generate unique IDs for each diagram
-import os    # For file operations and temporary paths
+# Numba is optional: when installed, the edge kernel below is compiled to
+# native code; otherwise we fall back to the plain NumPy version
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Utilities for unique file names
+import os  # For the worker PID in generated file names
+import asyncio  # To run CPU-bound rendering off the event loop
+from functools import lru_cache  # To cache rendered diagrams per input
+from itertools import count  # Monotonic counter for download file names
 
 
 # ------------------------------------------------------------------------------
@@ -35,9 +46,15 @@ app = FastAPI(title="Tiny NN Diagram Generator API",
         "url": "https://opensource.org/licenses/MIT",
     },
     docs_url="/docs",
-    redoc_url="/redoc" 
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse  # Serialize JSON responses with orjson
     )
 
+# Gzip responses for clients that accept it - SVG is highly compressible
+# text, so this cuts bytes on the wire by roughly 80% for typical diagrams.
+# Tiny responses (under 512 bytes) are sent as-is.
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=6)
+
 # Serve static files (like example_diagram.svg) from the /static URL
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -46,94 +63,186 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Step 2: Drawing logic for neural network diagram
 # ------------------------------------------------------------------------------
 
+# Spacing and appearance settings, shared by every render
+X_SPACING = 3       # Horizontal space between layers (layout units)
+Y_SPACING = 1.5     # Vertical space between nodes in a layer
+NODE_RADIUS = 0.3   # Size of each node circle
+LINE_WIDTH = 0.5    # Thickness of connection lines (in pixels)
+SCALE = 40          # Pixels per layout unit in the output SVG
+
+
+def fmt(v):
+    # Format a coordinate with 2 decimals max, dropping a trailing ".00" -
+    # full float repr would bloat the SVG with digits no renderer can show
+    s = f"{v:.2f}"
+    return s.rstrip('0').rstrip('.') if '.' in s else s
+
+
+def build_edge_endpoints(src_ys, dst_ys):
+    # All (src, dst) y-pairs for one layer pair: the source ys repeated for
+    # each destination node, the destination ys tiled for each source node
+    return np.repeat(src_ys, dst_ys.shape[0]), np.tile(dst_ys, src_ys.shape[0])
+
+
+if njit is not None:
+    # Compiled kernel: same pairing as the NumPy version, written as plain
+    # typed-array arithmetic so it compiles cleanly in nopython mode
+    @njit(cache=True)
+    def build_edge_endpoints(src_ys, dst_ys):
+        n, m = src_ys.shape[0], dst_ys.shape[0]
+        src_y = np.empty(n * m)
+        dst_y = np.empty(n * m)
+        for i in range(n):
+            for j in range(m):
+                src_y[i * m + j] = src_ys[i]
+                dst_y[i * m + j] = dst_ys[j]
+        return src_y, dst_y
+
+
+def get_prefix(layer_idx, num_layers):
+    # Label prefix for a layer's nodes
+    if layer_idx == 0:
+        return 'x'  # Input layer: x1, x2, ...
+    elif layer_idx == num_layers - 1:
+        return 'o'  # Output layer: o1, o2, ...
+    else:
+        return 'h'  # Hidden layers: h1, h2, ...
+
+
 def draw_dynamic_neural_net(layer_sizes,
                             colors=['red', 'blue', 'green', 'purple'],
-                            bias_color='gray',
-                            save_path="neural_network_diagram.svg"):
-    # Create a Matplotlib figure and axis
-    fig, ax = plt.subplots(figsize=(10, 8))
-    ax.axis('off')  # Hide axes and labels
-    ax.set_aspect('equal')  # Keep node circles round
-
-    # Define spacing and appearance settings
+                            bias_color='gray'):
     num_layers = len(layer_sizes)  # Total number of layers
-    x_spacing = 3                  # Horizontal space between layers
-    y_spacing = 1.5                # Vertical space between nodes in a layer
-    node_radius = 0.3              # Size of each node circle
-    line_width = 0.5               # Thickness of connection lines
-
-    # Calculate x-positions for each layer
-    x_positions = [i * x_spacing for i in range(num_layers)]
-
-    # Dictionary to store node (x, y) positions
-    node_positions = {}
-
-    # Helper function to define label prefix
-    def get_prefix(layer_idx):
-        if layer_idx == 0:
-            return 'x'  # Input layer: x1, x2, ...
-        elif layer_idx == num_layers - 1:
-            return 'o'  # Output layer: o1, o2, ...
-        else:
-            return 'h'  # Hidden layers: h1, h2, ...
+
+    # Calculate x-positions for each layer (already in pixels)
+    x_positions = [i * X_SPACING * SCALE for i in range(num_layers)]
+
+    # Per-layer arrays of node y-positions, vertically centered
+    # (SVG y grows downwards, so index 0 ends up at the top)
+    ys = [(np.arange(n) - (n - 1) / 2) * Y_SPACING * SCALE for n in layer_sizes]
+
+    # List of SVG fragments; joined into the returned document at the end.
+    # Every node shares one circle geometry, so it is defined once in <defs>
+    # and referenced per node with <use> - only position and fill vary.
+    parts = [f'<defs><circle id="nd" r="{fmt(NODE_RADIUS * SCALE)}" stroke="black" stroke-width="1"/></defs>']
+
+    # Node circles batched by fill color (one <g> per color, like a
+    # PatchCollection) and node labels, emitted after all edges
+    circles_by_color = {}
+    label_parts = []
 
     # Function to draw nodes in a layer
     def draw_layer(layer_idx, num_nodes, color):
-        # Compute vertically centered y-positions
-        y_positions = [-(i * y_spacing - (num_nodes - 1) * y_spacing / 2) for i in range(num_nodes)]
-
-        for i, y in enumerate(y_positions):
-            x = x_positions[layer_idx]
-            node_id = f"L{layer_idx}_N{i}"  # e.g., "L1_N2"
-            node_positions[node_id] = (x, y)  # Save (x, y) for line drawing
+        x = x_positions[layer_idx]
+        for i, y in enumerate(ys[layer_idx]):
 
-            # Draw the node (circle)
-            ax.add_patch(plt.Circle((x, y), radius=node_radius, color=color, ec='black', lw=1.0, zorder=3))
+            # Draw the node (a reference to the shared circle definition)
+            circles_by_color.setdefault(color, []).append(
+                f'<use href="#nd" x="{fmt(x)}" y="{fmt(y)}"/>')
 
             # Assign label: h1 on top, h2 below, etc.
-            label = f"{get_prefix(layer_idx)}{i + 1}"
-            ax.text(x, y, label, ha='center', va='center', color='white', fontsize=10, zorder=4)
+            label = f"{get_prefix(layer_idx, num_layers)}{i + 1}"
+            label_parts.append(f'<text x="{fmt(x)}" y="{fmt(y)}">{label}</text>')
 
-    # Draw all layers
-    for layer_idx, num_nodes in enumerate(layer_sizes):
-        color = colors[layer_idx] if layer_idx < len(colors) else 'blue'  # Fallback color
-        draw_layer(layer_idx, num_nodes, color)
+    # Maximum vertical extent of the widest layer (in pixels)
+    max_y = max(layer_sizes) * Y_SPACING / 2 * SCALE
 
-    # Draw bias nodes (above each hidden/output layer)
+    # Collect bias node positions first so edges can be drawn underneath
+    # nodes, keyed by plain layer index (no string formatting or hashing)
     bias_nodes = {}
-    max_y = max(layer_sizes) * y_spacing / 2  # Max vertical position
     for l in range(1, num_layers):  # Skip input layer
         x = (x_positions[l - 1] + x_positions[l]) / 2  # Between layers
-        y = max_y + 0.8  # Slightly above the top node
-        bias_id = f"b{l}"
-        bias_nodes[bias_id] = (x, y)
-
-        # Draw the bias node (circle and label)
-        ax.add_patch(plt.Circle((x, y), radius=node_radius, color=bias_color, ec='black', lw=1.0, zorder=3))
-        ax.text(x, y, bias_id, ha='center', va='center', color='white', fontsize=10, zorder=4)
-
-    # Draw connections between layers
+        y = -(max_y + 0.8 * SCALE)  # Slightly above the top node
+        bias_nodes[l] = (x, y)
+
+    # Draw connections between layers. All endpoint pairs for a layer pair
+    # are produced at once by broadcasting the per-layer y-arrays (repeat
+    # the source ys, tile the destination ys) instead of a nested Python
+    # loop over every (i, j) combination. Stroke attributes live on the two
+    # enclosing <g> elements (solid inter-layer edges, dashed bias edges)
+    # so each <line> carries only its four coordinates.
+    edge_parts = []
+    bias_edge_parts = []
     for l in range(num_layers - 1):
-        for i in range(layer_sizes[l]):
-            for j in range(layer_sizes[l + 1]):
-                src = node_positions[f"L{l}_N{i}"]
-                dst = node_positions[f"L{l+1}_N{j}"]
-                ax.plot([src[0], dst[0]], [src[1], dst[1]], color='black', linewidth=line_width, zorder=1)
+        src_x = fmt(x_positions[l])
+        dst_x = fmt(x_positions[l + 1])
+        src_y, dst_y = build_edge_endpoints(ys[l], ys[l + 1])
+        edge_parts.extend(
+            f'<line x1="{src_x}" y1="{fmt(y1)}" x2="{dst_x}" y2="{fmt(y2)}"/>'
+            for y1, y2 in zip(src_y, dst_y)
+        )
 
         # Connect bias node to all next-layer nodes with dashed lines
-        for j in range(layer_sizes[l + 1]):
-            src = bias_nodes[f"b{l+1}"]
-            dst = node_positions[f"L{l+1}_N{j}"]
-            ax.plot([src[0], dst[0]], [src[1], dst[1]], color='black', linewidth=line_width, linestyle='--', zorder=1)
+        bx, by = bias_nodes[l + 1]
+        bias_edge_parts.extend(
+            f'<line x1="{fmt(bx)}" y1="{fmt(by)}" x2="{dst_x}" y2="{fmt(y2)}"/>'
+            for y2 in ys[l + 1]
+        )
+
+    parts.append(f'<g stroke="black" stroke-width="{LINE_WIDTH}">')
+    parts.extend(edge_parts)
+    parts.append('</g>')
+    parts.append(f'<g stroke="black" stroke-width="{LINE_WIDTH}" stroke-dasharray="4,2">')
+    parts.extend(bias_edge_parts)
+    parts.append('</g>')
+
+    # Draw all layers (nodes and labels, on top of the edges)
+    for layer_idx, num_nodes in enumerate(layer_sizes):
+        color = colors[layer_idx] if layer_idx < len(colors) else 'blue'  # Fallback color
+        draw_layer(layer_idx, num_nodes, color)
 
-    # Set visible canvas area
-    ax.set_xlim(-1, x_positions[-1] + 2)
-    ax.set_ylim(-max_y - 1.5, max_y + 2)
+    # Draw bias nodes (above each hidden/output layer)
+    for l, (x, y) in bias_nodes.items():
+        circles_by_color.setdefault(bias_color, []).append(
+            f'<use href="#nd" x="{fmt(x)}" y="{fmt(y)}"/>')
+        label_parts.append(f'<text x="{fmt(x)}" y="{fmt(y)}">b{l}</text>')
+
+    # Emit the circle groups (one per fill color), then the labels on top.
+    # Font and anchoring attributes live once on the enclosing <g>, so each
+    # <text> carries only its position and content.
+    for color, circles in circles_by_color.items():
+        parts.append(f'<g fill="{color}">')
+        parts.extend(circles)
+        parts.append('</g>')
+    parts.append('<g font-family="DejaVu Sans, sans-serif" font-size="10" fill="white" '
+                 'text-anchor="middle" dominant-baseline="central">')
+    parts.extend(label_parts)
+    parts.append('</g>')
+
+    # Set visible canvas area: same margins the old Matplotlib axes used.
+    # The extents are known exactly from the layout, so the document size is
+    # declared up front (width/height plus viewBox) - no measuring pass over
+    # the drawn elements is ever needed.
+    min_x = -1 * SCALE
+    min_y = -(max_y + 2 * SCALE)
+    width = x_positions[-1] + 3 * SCALE
+    height = 2 * max_y + 3.5 * SCALE
+    # No XML prolog or metadata: UTF-8 is the XML default and every SVG
+    # consumer accepts a bare <svg> root, so the document starts directly
+    # with the root element
+    header = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{fmt(width)}" height="{fmt(height)}" '
+              f'viewBox="{fmt(min_x)} {fmt(min_y)} {fmt(width)} {fmt(height)}">')
+
+    # Return the assembled SVG document as a string (no disk round trip)
+    return header + "\n" + "\n".join(parts) + "\n</svg>\n"
+
+# Cached rendering wrapper: diagrams are deterministic functions of their
+# (layer_sizes, colors, bias_color) input, so repeat requests become an O(1)
+# dict hit instead of a full render. Arguments must be hashable (tuples).
+@lru_cache(maxsize=256)
+def _render_svg(layer_sizes, colors, bias_color):
+    svg = draw_dynamic_neural_net(
+        layer_sizes=list(layer_sizes),
+        colors=list(colors),
+        bias_color=bias_color
+    )
+    return svg.encode("utf-8")
+
+
+# Counter for download file names: PID + a monotonic index is unique per
+# worker and avoids the per-request /dev/urandom read that uuid4 costs
+_file_counter = count(1)
 
-    # Save diagram to SVG file
-    plt.savefig(save_path, format='svg', bbox_inches='tight')
-    plt.close()  # Free up memory
-    return save_path  # Return the saved path
 
 # ------------------------------------------------------------------------------
 # Step 3: API endpoint to generate SVG and return it
@@ -146,22 +255,22 @@ def draw_dynamic_neural_net(layer_sizes,
           tags=["Diagram Generation"])
 
 async def generate_svg(input_data: DiagramInput):
-    # Generate a unique file name using UUID
-    file_name = f"neural_net_{uuid.uuid4().hex}.svg"
-
-    # Save in /tmp directory (safe for cloud + local)
-    save_path = os.path.join("/tmp", file_name)
-
-    # Generate the diagram
-    draw_dynamic_neural_net(
-        layer_sizes=input_data.layer_sizes,
-        colors=input_data.colors,
-        bias_color=input_data.bias_color,
-        save_path=save_path
-    )
+    # Canonicalize the input into a hashable cache key
+    key = (tuple(input_data.layer_sizes), tuple(input_data.colors), input_data.bias_color)
+
+    # Render (or fetch the cached bytes for) the diagram in a worker thread
+    # so a large render never blocks the event loop for other requests
+    svg_bytes = await asyncio.to_thread(_render_svg, *key)
 
-    # Send back the SVG file as a downloadable response
-    return FileResponse(save_path, media_type="image/svg+xml", filename=file_name)
+    # Generate a unique file name (for the download prompt)
+    file_name = f"neural_net_{os.getpid()}_{next(_file_counter)}.svg"
+
+    # Send back the SVG bytes as a downloadable response
+    return Response(
+        content=svg_bytes,
+        media_type="image/svg+xml",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+    )
 # ------------------------------------------------------------------------------
 # Step 4: Root GET endpoint for health check and usage info
 # ------------------------------------------------------------------------------
@@ -1,19 +1,27 @@
-from pydantic import BaseModel, Field, model_validator # Used to define and validate request body schema
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator # Used to define and validate request body schema
+from typing import Tuple
+import re
+
+# Colors are interpolated into SVG attribute values by the renderer, so they
+# are restricted to a safe shape: a plain CSS color name (letters only) or a
+# hex code like #fff / #1a2b3c. Anything else - quotes, angle brackets,
+# ampersands - could break the XML or inject markup into the served SVG.
+_COLOR_RE = re.compile(r"^(?:[A-Za-z]+|#[0-9A-Fa-f]{3,8})$")
 
 # Input model for generating a neural network diagram
 class DiagramInput(BaseModel):
-    # `layer_sizes` is a list of integers where each element represents the number
-    # of nodes in a specific layer of the neural network.
-    layer_sizes: List[int] = Field(
+    # `layer_sizes` is a tuple of integers where each element represents the
+    # number of nodes in a specific layer of the neural network. Tuples (not
+    # lists) keep the frozen model hashable.
+    layer_sizes: Tuple[int, ...] = Field(
         ...,  # Ellipsis means this field is required (no default value)
         title="Layer Sizes",  # Title for use in autogenerated docs (e.g. Swagger)
         description="Number of nodes in each layer. Example: [4, 5, 8, 3]"
     )
 
-    # `colors` is a list of strings, each string representing a color assigned
+    # `colors` is a tuple of strings, each string representing a color assigned
     # to the corresponding layer in the neural network.
-    colors: List[str] = Field(
+    colors: Tuple[str, ...] = Field(
         ...,  # Required field
         title="Colors",
         description="List of colors for each layer. Should match the number of layers."
@@ -27,6 +35,37 @@ class DiagramInput(BaseModel):
         description="Color to use for the bias nodes."
     )
 
+    # Reject degenerate or pathological layer layouts before any rendering
+    # starts: the edge count grows with the product of adjacent layer sizes,
+    # so an uncapped request like [10000, 10000] would try to draw 10^8 edges
+    # and hang the worker. Raising ValueError here surfaces as a 422.
+    @field_validator("layer_sizes")
+    @classmethod
+    def validate_layer_sizes(cls, v):
+        if len(v) == 0:
+            raise ValueError("layer_sizes must contain at least one layer.")
+        if len(v) > 32:
+            raise ValueError("A network may have at most 32 layers.")
+        if any(n < 1 for n in v):
+            raise ValueError("Every layer must have at least one node.")
+        if any(n > 256 for n in v):
+            raise ValueError("A layer may have at most 256 nodes.")
+        if sum(a * b for a, b in zip(v, v[1:])) > 50_000:
+            raise ValueError("The network has too many edges to draw (limit: 50000).")
+        return v
+
+    # Reject anything that isn't a plain CSS color name or hex code before
+    # it can reach the SVG writer (see _COLOR_RE above)
+    @field_validator("colors", "bias_color")
+    @classmethod
+    def validate_colors(cls, v):
+        for color in ((v,) if isinstance(v, str) else v):
+            if not _COLOR_RE.match(color):
+                raise ValueError(
+                    f"Invalid color {color!r}: use a CSS color name (e.g. 'red') or hex code (e.g. '#1a2b3c')."
+                )
+        return v
+
     # Custom validator that runs *after* all fields are initialized.
     # Ensures that the number of colors matches the number of layers.
     @model_validator(mode="after")
@@ -35,15 +74,19 @@ class DiagramInput(BaseModel):
             raise ValueError("The number of colors must match the number of layers.")
         return self  # Return the validated instance
 
-    # Configuration class for extra behavior like examples in OpenAPI schema
-    class Config:
-        json_schema_extra = {
-            "example": {  # Example shown in Swagger or other UIs
+    # Model configuration: frozen makes validated inputs immutable (and
+    # hashable, so they can participate in caching), plus the example shown
+    # in Swagger or other UIs
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
+            "example": {
                 "layer_sizes": [4, 5, 8, 3],
                 "colors": ["red", "blue", "green", "purple"],
                 "bias_color": "gray"
             }
         }
+    )
 
 
 # Output model returned after diagram generation
@@ -70,11 +113,12 @@ class DiagramOutput(BaseModel):
     )
 
     # Configuration to show example output in the API documentation
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "svg": "<svg width='500' height='300'>...</svg>",
                 "node_count": 20,
                 "layer_count": 4
             }
         }
+    )